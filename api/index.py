@@ -1,27 +1,119 @@
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, Response, stream_with_context, send_from_directory
+from flask.json.provider import JSONProvider
 import os
-from datetime import datetime
-import requests
-import json
+import httpx
+import orjson
 from dotenv import load_dotenv
-from agents import Agent, Runner  # add at top with other imports
+from agents import Agent, Runner, set_default_openai_client  # add at top with other imports
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
 import asyncio  # added for event loop management
-import re  # add with other imports
-from pypdf import PdfReader # Import PdfReader from pypdf
+import pymupdf # PyMuPDF, bindings to the MuPDF C engine
 import io # To handle file stream
+import mmap
+import uuid
+import tempfile
+import sys
+import wave
+from array import array
+import hashlib
+import threading
+import time
+import itertools
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
 # Email sending imports
 import smtplib
 import logging
+import atexit
 from email.message import EmailMessage
+from email.utils import parseaddr
 # Consider adding a web search library if needed for Concept Explainer
 # from duckduckgo_search import DDGS # Example library
 
 load_dotenv()
 
+class OrjsonProvider(JSONProvider):
+    """Flask JSON provider backed by orjson, used by jsonify and request.get_json."""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(orjson.dumps(obj), mimetype='application/json')
+
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 
 ELEVENLABS_API_KEY = os.getenv('ELEVENLABS_API_KEY')
 ELEVENLABS_API_URL = "https://api.elevenlabs.io/v1/speech-to-text"
+
+# Shared HTTP/2 client so concurrent ElevenLabs calls multiplex over pooled
+# keep-alive connections instead of paying a TCP+TLS handshake per transcription.
+ELEVENLABS_CLIENT = httpx.Client(
+    headers={"xi-api-key": ELEVENLABS_API_KEY} if ELEVENLABS_API_KEY else None,
+    timeout=60.0,
+    transport=httpx.HTTPTransport(
+        http2=True,
+        retries=2,  # Retries failed connection attempts only
+        limits=httpx.Limits(max_keepalive_connections=32, max_connections=64),
+    ),
+)
+MAX_AUDIO_UPLOAD_BYTES = 25 * 1024 * 1024
+MIN_AUDIO_UPLOAD_BYTES = 1024  # smaller uploads are container headers with no usable audio
+MAX_RECORDING_DURATION_SECONDS = 3600
+
+# Worker pool for background tasks (transcription, summarization); results
+# are kept by task id until the client collects them from /api/task/<task_id>
+TASK_EXECUTOR = ThreadPoolExecutor(max_workers=32)
+TASKS = {}
+TASK_STREAM_HEARTBEAT = 5  # seconds between 'pending' events on /api/task/<task_id>/stream
+
+def submit_task(fn, *args) -> str:
+    """Runs fn(*args) on the task pool and returns the id to poll it by."""
+    task_id = uuid.uuid4().hex
+    TASKS[task_id] = TASK_EXECUTOR.submit(fn, *args)
+    return task_id
+
+def collect_task(task_id: str, future):
+    """Drops a finished task from the registry and returns its (response body, status code)."""
+    TASKS.pop(task_id, None)
+    try:
+        return future.result()
+    except Exception as e:
+        app.logger.exception(f"Background task {task_id} failed")
+        return {"error": f"Unexpected server error in background task: {e}"}, 500
+
+# Content-addressed cache of transcription and summary results, so identical
+# audio or transcripts skip the ElevenLabs / OpenAI round-trip entirely
+RESULT_CACHE_TTL = 24 * 60 * 60  # seconds
+RESULT_CACHE_MAX_ENTRIES = 512
+_result_cache = OrderedDict()
+_result_cache_lock = threading.Lock()
+
+def cache_get(key: str):
+    """Returns the cached value for key, or None if missing or expired."""
+    with _result_cache_lock:
+        entry = _result_cache.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del _result_cache[key]
+            return None
+        _result_cache.move_to_end(key)
+        return value
+
+def cache_set(key: str, value) -> None:
+    """Stores value under key, evicting the least recently used entries when full."""
+    with _result_cache_lock:
+        _result_cache[key] = (time.monotonic() + RESULT_CACHE_TTL, value)
+        _result_cache.move_to_end(key)
+        while len(_result_cache) > RESULT_CACHE_MAX_ENTRIES:
+            _result_cache.popitem(last=False)
 # Add OPENAI_API_KEY check, as Agents SDK requires it
 if not os.getenv('OPENAI_API_KEY'):
     app.logger.warning("OPENAI_API_KEY environment variable not set. Agents SDK may not function.")
@@ -30,93 +122,331 @@ if not os.getenv('OPENAI_API_KEY'):
 logging.basicConfig(level=logging.INFO)
 
 # --- Email Sending Function ---
-def send_email(recipient_email: str, subject: str, body: str) -> bool:
-    """Sends an email using Gmail SMTP.
+# Each worker thread keeps its own logged-in Gmail connection, so consecutive
+# emails skip the TCP + TLS handshake and AUTH round-trips.
+_smtp_local = threading.local()
+_smtp_connections = set()
+_smtp_connections_lock = threading.Lock()
+
+def close_smtp(smtp) -> None:
+    """Closes an SMTP connection and forgets it, ignoring errors from a dead socket."""
+    with _smtp_connections_lock:
+        _smtp_connections.discard(smtp)
+    try:
+        smtp.quit()
+    except (smtplib.SMTPException, OSError):
+        smtp.close()
+
+def get_smtp(sender_email: str, app_password: str) -> smtplib.SMTP_SSL:
+    """Returns this thread's Gmail SMTP connection, reconnecting if it has dropped."""
+    smtp = getattr(_smtp_local, 'smtp', None)
+    if smtp is not None:
+        try:
+            if smtp.noop()[0] == 250:
+                return smtp
+        except (smtplib.SMTPException, OSError):
+            pass
+        close_smtp(smtp)
+        _smtp_local.smtp = None
+
+    # Connect to Gmail's SSL SMTP server
+    smtp = smtplib.SMTP_SSL("smtp.gmail.com", 465)
+    try:
+        smtp.login(sender_email, app_password)
+    except Exception:
+        smtp.close()
+        raise
+    _smtp_local.smtp = smtp
+    with _smtp_connections_lock:
+        _smtp_connections.add(smtp)
+    return smtp
+
+@atexit.register
+def close_all_smtp() -> None:
+    """Closes every cached SMTP connection on interpreter shutdown."""
+    with _smtp_connections_lock:
+        connections = list(_smtp_connections)
+    for smtp in connections:
+        close_smtp(smtp)
+
+def is_valid_email(address: str) -> bool:
+    """Basic email validation: a bare address with a local part and a dotted domain."""
+    _, addr = parseaddr(address)
+    local, _, domain = addr.rpartition('@')
+    return addr == address and bool(local) and '.' in domain.strip('.') and len(addr.split()) == 1
+
+# Batches this large give up once a third of the messages have been rejected
+BATCH_ABORT_MIN_SIZE = 30
+BATCH_ABORT_FAILURE_RATIO = 1 / 3
+
+def _send_all(smtp: smtplib.SMTP, msgs: list[EmailMessage], sent: list[str], failed: list[str]) -> None:
+    """Sends each message over one SMTP connection.
+
+    Delivered recipients are appended to `sent` and refused ones to `failed`,
+    so a caller can resume after a dropped connection, which propagates.
+    """
+    batch_size = len(msgs) + len(sent) + len(failed)
+    abort_after = batch_size * BATCH_ABORT_FAILURE_RATIO if batch_size >= BATCH_ABORT_MIN_SIZE else None
+    for i, msg in enumerate(msgs):
+        try:
+            smtp.send_message(msg)
+            sent.append(msg["To"])
+        except (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused, smtplib.SMTPDataError) as e:
+            logging.error(f"SMTP Error occurred for {msg['To']}: {e}")
+            failed.append(msg["To"])
+            if abort_after is not None and len(failed) > abort_after:
+                logging.error(f"Aborting batch after {len(failed)} failures out of {batch_size} messages.")
+                failed.extend(m["To"] for m in msgs[i + 1:])
+                return
+
+def send_emails(recipient_emails: list[str], subject: str, body: str) -> list[str]:
+    """Sends the same email to several recipients over one Gmail SMTP session.
 
     Requires GMAIL_SENDER_EMAIL and GMAIL_APP_PASSWORD environment variables.
     Uses an App Password for Gmail authentication.
 
     Args:
-        recipient_email: The email address of the recipient.
+        recipient_emails: The email addresses of the recipients.
         subject: The subject line of the email.
         body: The plain text body of the email.
 
     Returns:
-        True if the email was sent successfully, False otherwise.
+        The recipients the email could not be sent to (empty on full success).
     """
     sender_email = os.getenv("GMAIL_SENDER_EMAIL")
     app_password = os.getenv("GMAIL_APP_PASSWORD") # Use an App Password
 
     if not sender_email or not app_password:
         logging.error("Gmail sender email or app password not found in environment variables (GMAIL_SENDER_EMAIL, GMAIL_APP_PASSWORD).")
-        return False
+        return list(recipient_emails)
 
-    msg = EmailMessage()
-    msg["From"] = sender_email
-    msg["To"] = recipient_email
-    msg["Subject"] = subject
-    msg.set_content(body)
+    msgs = []
+    for recipient_email in recipient_emails:
+        msg = EmailMessage()
+        msg["From"] = sender_email
+        msg["To"] = recipient_email
+        msg["Subject"] = subject
+        msg.set_content(body)
+        msgs.append(msg)
 
+    sent, failed = [], []
     try:
-        # Connect to Gmail's SSL SMTP server
-        with smtplib.SMTP_SSL("smtp.gmail.com", 465) as smtp:
-            smtp.login(sender_email, app_password)
-            smtp.send_message(msg)
-            logging.info(f"Email sent successfully to {recipient_email}")
-            return True
+        try:
+            _send_all(get_smtp(sender_email, app_password), msgs, sent, failed)
+        except smtplib.SMTPServerDisconnected:
+            # The cached connection dropped mid-batch; resume from the first unsent message once
+            close_smtp(_smtp_local.smtp)
+            _smtp_local.smtp = None
+            _send_all(get_smtp(sender_email, app_password), msgs[len(sent) + len(failed):], sent, failed)
+        logging.info(f"Email sent successfully to {len(sent)} of {len(msgs)} recipients")
+        return failed
     except smtplib.SMTPAuthenticationError:
         logging.error("SMTP Authentication Error: Check sender email and app password.")
-        return False
     except smtplib.SMTPException as e:
         logging.error(f"SMTP Error occurred: {e}")
-        return False
     except Exception as e:
         logging.error(f"An unexpected error occurred while sending email: {e}")
+    return [recipient_email for recipient_email in recipient_emails if recipient_email not in sent]
+
+def send_email(recipient_email: str, subject: str, body: str) -> bool:
+    """Sends an email to a single recipient using Gmail SMTP.
+
+    Returns:
+        True if the email was sent successfully, False otherwise.
+    """
+    return not send_emails([recipient_email], subject, body)
+
+# --- Utility Function for Persisting Recordings ---
+# Recordings default to tmpfs (or the system temp dir) so writes are memory-speed
+# and work on read-only deployments; old recordings are evicted in the background.
+_default_recordings_root = '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir()
+RECORDINGS_DIR = os.getenv('RECORDINGS_DIR', os.path.join(_default_recordings_root, 'recordings'))
+TRANSCRIPT_PATH = os.path.join(RECORDINGS_DIR, 'transcript.txt')
+RECORDING_TTL_SECONDS = int(os.getenv('RECORDING_TTL_SECONDS', 60 * 60))
+RECORDING_GC_INTERVAL_SECONDS = 60
+try:
+    os.makedirs(RECORDINGS_DIR, exist_ok=True)
+except OSError as e:
+    app.logger.error(f"Unable to create recordings directory {RECORDINGS_DIR}: {e}")
+
+def evict_old_recordings() -> None:
+    """Deletes recordings older than RECORDING_TTL_SECONDS, keeping the transcript file."""
+    cutoff = time.time() - RECORDING_TTL_SECONDS
+    try:
+        with os.scandir(RECORDINGS_DIR) as entries:
+            for entry in entries:
+                if entry.name.startswith('recording_') and entry.stat().st_mtime < cutoff:
+                    os.unlink(entry.path)
+    except OSError as e:
+        app.logger.warning(f"Unable to evict old recordings: {e}")
+
+def _recording_gc_loop() -> None:
+    while True:
+        time.sleep(RECORDING_GC_INTERVAL_SECONDS)
+        evict_old_recordings()
+
+threading.Thread(target=_recording_gc_loop, name="recording-gc", daemon=True).start()
+
+# Small dedicated pool so recording writes never queue behind long-running tasks
+RECORDING_EXECUTOR = ThreadPoolExecutor(max_workers=4)
+# Makes filenames unique when uploads land in the same second
+RECORDING_COUNTER = itertools.count()
+
+def save_recording(audio_bytes: bytes, filepath: str) -> bool:
+    """Writes an uploaded recording to disk, logging instead of raising on failure.
+
+    Args:
+        audio_bytes: The raw bytes of the uploaded audio.
+        filepath: Destination path for the recording.
+
+    Returns:
+        True if the recording was written, False otherwise.
+    """
+    try:
+        with open(filepath, 'wb') as f:
+            f.write(audio_bytes)
+        app.logger.info(f"Audio file saved to {filepath}")
+        return True
+    except Exception as e:
+        app.logger.error(f"Error saving audio file {filepath}: {e}")
         return False
 
 # --- Utility Function for Running Agents ---
+# One long-lived event loop on a daemon thread runs every agent call, so the
+# Agents SDK's async HTTP client and its pooled connections outlive a request.
+AGENT_LOOP = asyncio.new_event_loop()
+threading.Thread(target=AGENT_LOOP.run_forever, name="agent-loop", daemon=True).start()
+AGENT_TIMEOUT = 120  # seconds
+# One pooled HTTP/2 client for every agent call, so OpenAI connections stay warm
+# across requests; it is only ever used from AGENT_LOOP
+AGENT_HTTP_CLIENT = DefaultAsyncHttpxClient(http2=True, limits=httpx.Limits(max_keepalive_connections=20, max_connections=100))
+if os.getenv('OPENAI_API_KEY'):
+    set_default_openai_client(AsyncOpenAI(http_client=AGENT_HTTP_CLIENT))
+MIN_AGENT_TEXT_LENGTH = 20  # shorter transcripts are not worth an LLM call
+
 def run_agent_sync(agent, prompt):
-    """Helper function to run an agent synchronously."""
+    """Helper function to run an agent synchronously on the shared agent loop."""
+    future = asyncio.run_coroutine_threadsafe(Runner.run(agent, prompt), AGENT_LOOP)
     try:
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        result = Runner.run_sync(agent, prompt)
-        loop.close()
+        result = future.result(timeout=AGENT_TIMEOUT)
         return result.final_output.strip()
     except Exception as e:
+        future.cancel()
         app.logger.error(f"Error running agent {agent.name}: {e}")
         raise  # Re-raise the exception to be handled by the endpoint
 
+def run_agents_sync(calls: list) -> list:
+    """Runs several (agent, prompt) pairs concurrently on the shared agent loop.
+
+    Returns each agent's final output in call order, or the exception it raised.
+    """
+    async def gather_outputs():
+        return await asyncio.gather(*(Runner.run(agent, prompt) for agent, prompt in calls), return_exceptions=True)
+
+    future = asyncio.run_coroutine_threadsafe(gather_outputs(), AGENT_LOOP)
+    try:
+        results = future.result(timeout=AGENT_TIMEOUT)
+    except Exception as e:
+        future.cancel()
+        app.logger.error(f"Error running agents {[agent.name for agent, _ in calls]}: {e}")
+        raise
+    return [result if isinstance(result, BaseException) else result.final_output.strip() for result in results]
+
+# --- Agents ---
+# Agent definitions are static, so build them once at import and share them
+SUMMARY_AGENT = Agent(
+    name="Summarizer",
+    model="gpt-4.1", # Specify the model
+    instructions=("You are an assistant that summarizes conversation transcripts. "
+                  "Pay close attention to the provided transcript. "
+                  "Provide a concise summary focusing on key topics and decisions made. "
+                  "Return ONLY a JSON object with a single key 'summary'. Example: {\"summary\": \"Discussion focused on project timelines...\"}"),
+)
+
+PROMPTS_AGENT = Agent(
+    name="ConversationPrompter",
+    model="gpt-4.1", # Specify the model
+    instructions=("Analyze the *latest* part of the conversation transcript. Pay close attention to the provided transcript. "
+                  "Suggest 1-2 open-ended questions/prompts to keep the discussion flowing or explore related topics. "
+                  "Focus on relevance to recent exchanges. "
+                  "Return ONLY a JSON object: {\"prompts\": [\"prompt1\", \"prompt2\"]}. If no prompts are suitable, return {\"prompts\": []}."),
+)
+
+AGENDA_AGENT = Agent(
+    name="AgendaTracker",
+    model="gpt-4.1", # Specify the model
+    instructions=("Compare the meeting agenda with the *latest* part of the transcript. Pay close attention to the provided transcript and agenda. "
+                  "Identify which specific agenda item is most likely being discussed *right now*. "
+                  "If the discussion is between items or off-topic, state that clearly. "
+                  "Return ONLY a JSON object: {\"current_item\": \"description of current focus\"}. "
+                  "The description should be the agenda item text, or a status like 'Off-topic discussion', 'Transitioning between items', etc."),
+)
+
+# TODO: Integrate a real web search tool here.
+# Example using a placeholder function tool:
+# def web_search_tool(query: str) -> str:
+#     """Searches the web for a given query and returns a summary."""
+#     # Replace with actual web search implementation (e.g., using requests, BeautifulSoup, search API)
+#     print(f"Simulating web search for: {query}")
+#     if "gradient descent" in query.lower():
+#         return "Gradient descent is an optimization algorithm used to minimize a function by iteratively moving in the direction of steepest descent."
+#     elif "react hooks" in query.lower():
+#         return "React Hooks are functions that let you 'hook into' React state and lifecycle features from function components."
+#     else:
+#         return f"No specific information found for '{query}' in this simulation."
+
+CONCEPTS_AGENT = Agent(
+    name="ConceptExplainer",
+    model="gpt-4.1", # Specify the model
+    instructions=("Read the *latest* part of the conversation transcript. Pay close attention to the provided transcript. "
+                  "Identify 1-2 potentially complex technical terms, jargon, or concepts mentioned *recently*. "
+                  "Provide a brief (1-sentence) definition/explanation for each. "
+                  # "Use the web_search_tool if needed." # Uncomment when tool is added
+                  "Return ONLY a JSON object: {\"explanations\": [{\"term\": \"Term1\", \"explanation\": \"Explanation1\"}, ...]}. "
+                  "If no complex concepts are found, return {\"explanations\": []}."),
+    # tools=[] # Add actual tool function here when implemented
+)
+
+def strip_code_fences(text: str) -> str:
+    """Removes a leading ```/```<language> and trailing ``` markdown fence from agent output."""
+    text = text.strip()
+    if text.startswith('```'):
+        # Drop the whole opening fence line, whatever language tag it carries
+        newline = text.find('\n')
+        text = text[newline + 1:] if newline != -1 else text[3:]
+    if text.endswith('```'):
+        text = text[:-3]
+    return text.strip()
+
+def parse_agent_json(raw_output: str, key: str, default):
+    """Returns `key` from an agent's JSON reply, or `default` if it is not valid JSON or lacks the key."""
+    text = strip_code_fences(raw_output)
+    try:
+        data = orjson.loads(text)
+    except orjson.JSONDecodeError:
+        app.logger.warning(f"Agent returned non-JSON output for '{key}': {text}")
+        return default
+    if not isinstance(data, dict):
+        return default
+    return data.get(key, default)
+
+# agenda.txt lives next to this module
+API_DIR = os.path.dirname(__file__)
+AGENDA_PATH = os.path.join(API_DIR, 'agenda.txt')
+
 @app.route("/api/save-agenda", methods=['POST'])
 def save_agenda():
-    data = request.get_json()
+    data = request.get_json(silent=True) or {}
     text_content = data.get('text')
 
     if text_content is None:
         return jsonify({'error': 'No text content provided'}), 400
 
-    # Ensure agenda.txt is saved relative to the api directory or a designated data directory
-    file_path = os.path.join(os.path.dirname(__file__), 'agenda.txt')
+    file_path = AGENDA_PATH
 
     try:
-        # First, ensure the directory has appropriate permissions
-        api_dir = os.path.dirname(__file__)
-        try:
-            # Attempt to make directory writable by all
-            os.chmod(api_dir, 0o777)  # Full permissions for directory
-        except Exception as e:
-            app.logger.warning(f"Unable to set directory permissions: {e}")
-        
-        # Write the file
         with open(file_path, 'w', encoding='utf-8') as f:
             f.write(text_content)
-        
-        # Ensure the file is accessible by setting permissive permissions
-        try:
-            os.chmod(file_path, 0o666)  # Read/write for everyone
-        except Exception as e:
-            app.logger.warning(f"Unable to set file permissions: {e}")
-            
         app.logger.info(f"Agenda saved to {file_path}")
         return jsonify({'message': 'Agenda saved successfully'}), 200
     except PermissionError as e:
@@ -128,20 +458,14 @@ def save_agenda():
 
 @app.route("/api/load-agenda", methods=['GET'])
 def load_agenda():
-    file_path = os.path.join(os.path.dirname(__file__), 'agenda.txt')
+    file_path = AGENDA_PATH
     
     try:
         # Check if the file exists
         if not os.path.exists(file_path):
             app.logger.info(f"Agenda file not found at {file_path}")
             return jsonify({'error': 'No saved agenda found'}), 404
-            
-        # Try to ensure the file is readable
-        try:
-            os.chmod(file_path, 0o666)  # Read/write for everyone
-        except Exception as e:
-            app.logger.warning(f"Unable to set file permissions: {e}")
-            
+
         with open(file_path, 'r', encoding='utf-8') as f:
             content = f.read()
         app.logger.info(f"Agenda loaded from {file_path}")
@@ -153,6 +477,9 @@ def load_agenda():
         app.logger.error(f"Error reading file {file_path}: {e}")
         return jsonify({'error': f'Failed to load agenda: {e}'}), 500
 
+PDF_IN_MEMORY_LIMIT = 1024 * 1024  # bytes; larger uploads are memory-mapped
+PDF_HEADER_SEARCH_BYTES = 1024  # readers accept a %PDF- header anywhere in the first 1 KiB
+
 @app.route("/api/extract-pdf-text", methods=['POST'])
 def extract_pdf_text():
     if 'file' not in request.files:
@@ -167,150 +494,403 @@ def extract_pdf_text():
         return jsonify({"error": "Invalid file type, only PDF allowed"}), 400
 
     try:
-        # Read the file into memory
-        pdf_file_stream = io.BytesIO(file.read())
-        reader = PdfReader(pdf_file_stream)
-        text = ""
-        for page in reader.pages:
-            extracted = page.extract_text()
-            if extracted: # Check if text was extracted
-                text += extracted + "\n" # Add newline between pages
+        # Large uploads are already spooled to a temporary file by Werkzeug, so
+        # memory-map it rather than reading a second copy into memory; small
+        # ones are cheap enough to read directly.
+        stream = file.stream
+        # Check the header before handing the upload to the PDF parser
+        if b'%PDF-' not in stream.read(PDF_HEADER_SEARCH_BYTES):
+            return jsonify({"error": "Invalid file type, only PDF allowed"}), 400
+        size = stream.seek(0, io.SEEK_END)
+        stream.seek(0)
+        if size > PDF_IN_MEMORY_LIMIT:
+            pdf_view = memoryview(mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ))
+        else:
+            pdf_view = memoryview(stream.read())
+        try:
+            doc = pymupdf.open(stream=pdf_view, filetype="pdf")
+            try:
+                # Collect page texts and join once instead of growing a string
+                page_texts = []
+                for page in doc:
+                    # Keep text blocks only (type 0), never image blocks
+                    page_text = "".join(block[4] for block in page.get_text("blocks") if block[6] == 0)
+                    if page_text: # Check if text was extracted
+                        page_texts.append(page_text)
+                text = "\n".join(page_texts) # Newline between pages
+            finally:
+                doc.close()
+        finally:
+            pdf_view.release()
 
         if not text.strip(): # Check if extracted text is empty after stripping whitespace
              return jsonify({"text": "", "message": "PDF contained no extractable text."}), 200
 
         return jsonify({"text": text}), 200
     except Exception as e:
-        app.logger.error(f"Error extracting text from PDF: {e}")
+        app.logger.exception("Error extracting text from PDF")
         return jsonify({"error": f"Failed to process PDF: {e}"}), 500
 
-@app.route("/api/save-audio", methods=['POST'])
-def save_audio():
-    if not ELEVENLABS_API_KEY:
-        app.logger.error("ElevenLabs API Key not configured.")
-        return jsonify({"error": "Server configuration error: Missing API Key"}), 500
-        
-    if 'audio' not in request.files:
-        return jsonify({"error": "No audio file provided"}), 400
+TRANSCRIPTION_FORM_FIELDS = {
+    'model_id': 'scribe_v1',  # Use the valid 'scribe_v1' model
+    'diarize': 'true'         # Enable speaker diarization
+}
 
-    audio_file = request.files['audio']
-    duration = request.form.get('duration', '0')
-    
-    # Define path within a try block to handle potential issues
-    filepath = None
+# The multipart form fields never change, so encode them once; each request
+# only adds the audio part between these constant byte strings.
+_MULTIPART_BOUNDARY = uuid.uuid4().hex
+TRANSCRIPTION_CONTENT_TYPE = f"multipart/form-data; boundary={_MULTIPART_BOUNDARY}"
+_MULTIPART_FIELDS = b''.join(
+    f'--{_MULTIPART_BOUNDARY}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode('utf-8')
+    for name, value in TRANSCRIPTION_FORM_FIELDS.items()
+)
+_MULTIPART_CLOSE = f'\r\n--{_MULTIPART_BOUNDARY}--\r\n'.encode('utf-8')
+
+def transcription_request_body(filename: str, audio_bytes: bytes) -> tuple:
+    """Builds the multipart/form-data body for an ElevenLabs speech-to-text request.
+
+    The body is returned as a tuple of parts that are sent one after another,
+    so the audio is never copied into a joined buffer.
+    """
+    safe_filename = filename.replace('\\', '\\\\').replace('"', '%22').replace('\r', '').replace('\n', '')
+    file_header = (
+        f'--{_MULTIPART_BOUNDARY}\r\n'
+        f'Content-Disposition: form-data; name="file"; filename="{safe_filename}"\r\n'
+        'Content-Type: audio/webm\r\n\r\n'
+    ).encode('utf-8')
+    return (_MULTIPART_FIELDS, file_header, audio_bytes, _MULTIPART_CLOSE)
+
+def transcription_request_headers(body: tuple) -> dict:
+    """Headers for a transcription_request_body; the explicit length avoids chunked encoding."""
+    return {'Content-Type': TRANSCRIPTION_CONTENT_TYPE, 'Content-Length': str(sum(map(len, body)))}
+
+def elevenlabs_error_detail(response) -> str:
+    """Extracts a readable error message from an ElevenLabs error response.
+
+    Handles {"detail": {"message": ...}} and {"detail": "..."} bodies; anything
+    else falls back to the raw response text.
+    """
     try:
-        recordings_dir = os.path.join(os.path.dirname(__file__), 'recordings')
-        os.makedirs(recordings_dir, exist_ok=True)
-        
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = f"recording_{timestamp}_{duration}s.webm"
-        filepath = os.path.join(recordings_dir, filename)
-        
-        # Save the audio file
-        audio_file.save(filepath)
-        app.logger.info(f"Audio file saved to {filepath}")
-        
-    except OSError as e:
-        app.logger.error(f"Error saving audio file: {e}")
-        return jsonify({"error": f"Server error saving file: {e}"}), 500
+        response_data = orjson.loads(response.content)
+    except orjson.JSONDecodeError:
+        return response.text[:500] # Not JSON, use raw text (limit length)
+    match response_data:
+        case {"detail": {"message": str(message)}} | {"detail": str(message)}:
+            return message
+    return response.text[:500] # Unexpected structure, show raw JSON
+
+# Transcript file writes run on one background worker, so requests don't wait on
+# disk IO, concurrent appends never interleave, and a clear is ordered after any
+# appends queued before it
+TRANSCRIPT_EXECUTOR = ThreadPoolExecutor(max_workers=1)
+
+def append_transcript(text: str) -> None:
+    """Queues transcribed text to be appended to the running transcript file."""
+    TRANSCRIPT_EXECUTOR.submit(write_transcript, text)
+
+def write_transcript(text: str) -> None:
+    """Appends transcribed text to the running transcript file, logging any failure."""
+    try:
+        # Append mode creates the file on first use; binary mode skips the
+        # text-layer wrapper, so each entry is one encode and one write
+        with open(TRANSCRIPT_PATH, "ab") as tf:
+            tf.write(text.encode("utf-8") + b"\n\n")
+    except PermissionError as e:
+        app.logger.error(f"Permission error writing transcript file: {e}")
     except Exception as e:
-        app.logger.error(f"Unexpected error saving file: {e}")
-        return jsonify({"error": f"Unexpected server error saving file: {e}"}), 500
+        app.logger.error(f"Error writing transcript file: {e}")
 
-    # Send to ElevenLabs for transcription
+def transcription_failed(filename: str, error: str):
+    """Builds the (response body, status code) reported when transcription fails."""
+    return {
+        "message": "Audio saved but transcription failed",
+        "filename": filename,
+        "error": error
+    }, 500 # Return 500 for server-side API issues
+
+# Peak 16-bit amplitude below which a WAV upload is treated as silence (about -36 dBFS)
+SILENCE_PEAK_THRESHOLD = 500
+
+def is_silent_wav(audio_bytes: bytes) -> bool:
+    """Returns True if audio_bytes is a 16-bit PCM WAV whose peak amplitude is below
+    SILENCE_PEAK_THRESHOLD. Anything else (other formats, unreadable WAVs) is
+    reported as not silent so it still goes to ElevenLabs.
+    """
+    if not audio_bytes.startswith(b'RIFF'):
+        return False
     try:
-        headers = {"xi-api-key": ELEVENLABS_API_KEY}
-        
-        with open(filepath, 'rb') as f:
-            # Combine file and model_id into the files payload for multipart/form-data
-            files_payload = {
-                'file': (filename, f, 'audio/webm'),
-                'model_id': (None, 'scribe_v1'),  # Use the valid 'scribe_v1' model
-                'diarize': (None, 'true')        # Enable speaker diarization
-            }
-            response = requests.post(
+        with wave.open(io.BytesIO(audio_bytes)) as wav:
+            if wav.getsampwidth() != 2:
+                return False
+            samples = array('h', wav.readframes(wav.getnframes()))
+    except (wave.Error, EOFError, ValueError):
+        return False
+    if not samples:
+        return True
+    if sys.byteorder == 'big':
+        samples.byteswap()  # WAV samples are little-endian
+    # max/min run in C, so this stays cheap even for long clips
+    return max(max(samples), -min(samples)) < SILENCE_PEAK_THRESHOLD
+
+SILENT_TRANSCRIPTION = {"text": "", "words": []}
+
+def transcribe_audio(audio_bytes: bytes, filename: str):
+    """Sends audio to ElevenLabs and appends the resulting text to the transcript file.
+
+    Args:
+        audio_bytes: The raw bytes of the recording.
+        filename: The recording filename reported back to the client.
+
+    Returns:
+        A (response body, status code) tuple for the client.
+    """
+    # Empty and silent clips have nothing to transcribe, so skip the API call
+    if len(audio_bytes) < MIN_AUDIO_UPLOAD_BYTES or is_silent_wav(audio_bytes):
+        app.logger.info("Skipping transcription of silent recording.")
+        return {
+            "message": "Audio saved; no speech detected",
+            "filename": filename,
+            "transcription": SILENT_TRANSCRIPTION
+        }, 200
+
+    try:
+        # Identical uploads reuse the cached transcription
+        cache_key = 'transcription:' + hashlib.sha256(audio_bytes).hexdigest()
+        transcription_data = cache_get(cache_key)
+        if transcription_data is None:
+            # Send the audio file with the model options as multipart/form-data
+            request_body = transcription_request_body(filename, audio_bytes)
+            response = ELEVENLABS_CLIENT.post(
                 ELEVENLABS_API_URL,
-                headers=headers,
-                files=files_payload, # Send the combined payload
-                timeout=60
+                content=request_body,
+                headers=transcription_request_headers(request_body)
             )
 
-        # Check response status *after* the request
-        response.raise_for_status() # Raises HTTPError for bad responses (4xx or 5xx)
-            
-        transcription_data = response.json()
-        app.logger.info("Transcription successful.")
+            # Check response status *after* the request
+            response.raise_for_status() # Raises HTTPError for bad responses (4xx or 5xx)
+
+            transcription_data = orjson.loads(response.content)
+            cache_set(cache_key, transcription_data)
+            app.logger.info("Transcription successful.")
+        else:
+            app.logger.info("Transcription served from cache.")
         # Save transcript text to file
-        transcripts_file = os.path.join(recordings_dir, "transcript.txt")
-        try:
-            # Create new file with permissive permissions if it doesn't exist
-            if not os.path.exists(transcripts_file):
-                with open(transcripts_file, "w", encoding="utf-8") as tf:
-                    pass  # Just create the file
-                try:
-                    os.chmod(transcripts_file, 0o666)  # Read/write for everyone
-                except Exception as e:
-                    app.logger.warning(f"Unable to set transcript file permissions: {e}")
-            
-            # Append to the transcript file
-            with open(transcripts_file, "a", encoding="utf-8") as tf:
-                tf.write(transcription_data.get("text", "") + "\n\n")
-                
-        except PermissionError as e:
-            app.logger.error(f"Permission error writing transcript file: {e}")
-        except Exception as e:
-            app.logger.error(f"Error writing transcript file: {e}")
-        return jsonify({
+        append_transcript(transcription_data.get("text", ""))
+        return {
             "message": "Audio saved and transcribed successfully",
             "filename": filename,
             "transcription": transcription_data
-        })
+        }, 200
             
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         app.logger.error(f"ElevenLabs API request failed: {e}")
         error_detail = str(e) # Default error message
         # Try to parse more specific error details from the response body
-        if e.response is not None:
-            try:
-                response_data = e.response.json()
-                # Check if response_data is a dict and has expected keys
-                if isinstance(response_data, dict) and 'detail' in response_data:
-                    detail_data = response_data['detail']
-                    # Check if detail_data is also a dict with 'message'
-                    if isinstance(detail_data, dict) and 'message' in detail_data:
-                        error_detail = detail_data['message']
-                    # Handle cases where detail might be a string directly
-                    elif isinstance(detail_data, str):
-                        error_detail = detail_data
-                    else: # Fallback if structure is unexpected
-                        error_detail = json.dumps(response_data) # Show raw JSON
-                else:
-                    # If not the expected dict structure, show raw JSON
-                    error_detail = json.dumps(response_data)
-            except json.JSONDecodeError:
-                # If response is not JSON, use raw text
-                error_detail = e.response.text[:500] # Limit length
-            except Exception as parse_exc: # Catch any other parsing errors
-                app.logger.error(f"Error parsing ElevenLabs error response: {parse_exc}")
-                error_detail = f"(Failed to parse error response: {e.response.text[:200]})"
-                
-        return jsonify({
-            "message": "Audio saved but transcription failed",
-            "filename": filename,
-            "error": f"API Error: {error_detail}"
-        }), 500 # Return 500 for server-side API issues
+        if isinstance(e, httpx.HTTPStatusError):
+            error_detail = elevenlabs_error_detail(e.response)
+        return transcription_failed(filename, f"API Error: {error_detail}")
         
     except Exception as e:
-        app.logger.error(f"Unexpected error during transcription: {e}")
+        app.logger.exception("Unexpected error during transcription")
+        return transcription_failed(filename, f"Unexpected server error during transcription: {e}")
+
+def relay_transcription(audio_bytes: bytes, filename: str):
+    """Relays the ElevenLabs JSON body to the client as it arrives.
+
+    Skips decoding and re-encoding the (possibly large) transcription; the body
+    is parsed once after it has been sent, to update the cache and transcript.
+    The recording filename is returned in the X-Filename header.
+    """
+    headers = {'X-Filename': filename}
+    if len(audio_bytes) < MIN_AUDIO_UPLOAD_BYTES or is_silent_wav(audio_bytes):
+        return jsonify(SILENT_TRANSCRIPTION), 200, headers
+
+    cache_key = 'transcription:' + hashlib.sha256(audio_bytes).hexdigest()
+    transcription_data = cache_get(cache_key)
+    if transcription_data is not None:
+        append_transcript(transcription_data.get("text", ""))
+        return jsonify(transcription_data), 200, headers
+
+    request_body = transcription_request_body(filename, audio_bytes)
+    upstream_request = ELEVENLABS_CLIENT.build_request(
+        "POST",
+        ELEVENLABS_API_URL,
+        content=request_body,
+        headers=transcription_request_headers(request_body)
+    )
+    try:
+        upstream = ELEVENLABS_CLIENT.send(upstream_request, stream=True)
+    except httpx.HTTPError as e:
+        app.logger.error(f"ElevenLabs API request failed: {e}")
+        body, status = transcription_failed(filename, f"API Error: {e}")
+        return jsonify(body), status
+    if upstream.is_error:
+        upstream.read()
+        upstream.close()
+        app.logger.error(f"ElevenLabs API request failed with status {upstream.status_code}")
+        body, status = transcription_failed(filename, f"API Error: {elevenlabs_error_detail(upstream)}")
+        return jsonify(body), status
+
+    def generate():
+        chunks = []
+        try:
+            for chunk in upstream.iter_bytes(64 * 1024):
+                chunks.append(chunk)
+                yield chunk
+        finally:
+            upstream.close()
+        try:
+            transcription_data = orjson.loads(b''.join(chunks))
+        except orjson.JSONDecodeError:
+            app.logger.error("ElevenLabs returned a non-JSON transcription body.")
+            return
+        cache_set(cache_key, transcription_data)
+        append_transcript(transcription_data.get("text", ""))
+
+    return Response(stream_with_context(generate()),
+                    mimetype=upstream.headers.get('Content-Type', 'application/json'),
+                    headers=headers)
+
+@app.route("/api/save-audio", methods=['POST'])
+def save_audio():
+    if not ELEVENLABS_API_KEY:
+        app.logger.error("ElevenLabs API Key not configured.")
+        return jsonify({"error": "Server configuration error: Missing API Key"}), 500
+        
+    # Reject oversized uploads from the declared length before the form is parsed
+    if request.content_length and request.content_length > MAX_AUDIO_UPLOAD_BYTES:
+        return jsonify({"error": "Audio file too large"}), 413
+
+    if 'audio' not in request.files:
+        return jsonify({"error": "No audio file provided"}), 400
+
+    audio_file = request.files['audio']
+    if audio_file.content_length and audio_file.content_length > MAX_AUDIO_UPLOAD_BYTES:
+        return jsonify({"error": "Audio file too large"}), 413
+    if not (audio_file.mimetype.startswith('audio/') or audio_file.mimetype == 'video/webm'):
+        return jsonify({"error": "Invalid file type, only audio allowed"}), 400
+    # Duration ends up in the filename, so only accept a bounded integer
+    try:
+        duration = max(0, min(int(request.form.get('duration', '0')), MAX_RECORDING_DURATION_SECONDS))
+    except ValueError:
+        duration = 0
+    
+    timestamp = time.strftime('%Y%m%d_%H%M%S')
+    filename = f"recording_{timestamp}_{next(RECORDING_COUNTER):x}_{duration:d}s.webm"
+    filepath = os.path.join(RECORDINGS_DIR, filename)
+
+    # Read the upload once and write it to disk in the background, so the
+    # ElevenLabs request starts as soon as the bytes are in memory
+    audio_bytes = audio_file.read()
+    RECORDING_EXECUTOR.submit(save_recording, audio_bytes, filepath)
+
+    # Background mode: hand the transcription to the worker pool and let the
+    # client poll /api/task/<task_id> instead of holding this worker
+    if request.form.get('async', '').lower() == 'true':
+        task_id = submit_task(transcribe_audio, audio_bytes, filename)
         return jsonify({
-            "message": "Audio saved but transcription failed",
-            "filename": filename,
-            "error": f"Unexpected server error during transcription: {e}"
-        }), 500
+            "task_id": task_id,
+            "status_url": f"/api/task/{task_id}",
+            "stream_url": f"/api/task/{task_id}/stream"
+        }), 202
+
+    # Raw mode: relay ElevenLabs' JSON body as it streams in rather than
+    # wrapping it in the usual envelope
+    if request.form.get('raw', '').lower() == 'true':
+        return relay_transcription(audio_bytes, filename)
+
+    # Send to ElevenLabs for transcription
+    body, status = transcribe_audio(audio_bytes, filename)
+    return jsonify(body), status
+
+@app.route("/api/recordings/<filename>", methods=['GET'])
+def get_recording(filename):
+    """Download a saved recording.
+
+    send_from_directory rejects paths outside RECORDINGS_DIR and serves the file
+    through the WSGI file wrapper (sendfile under gunicorn/uWSGI), with
+    ETag/Last-Modified so repeat requests can be answered with 304.
+    """
+    if not filename.startswith('recording_'):
+        return jsonify({"error": "Recording not found"}), 404
+    return send_from_directory(RECORDINGS_DIR, filename, mimetype='audio/webm', conditional=True, etag=True)
+
+@app.route("/api/task/<task_id>", methods=['GET'])
+@app.route("/api/transcription/<task_id>", methods=['GET'])
+def get_task(task_id):
+    """Poll the result of a background task started by /api/save-audio or /api/summarize."""
+    future = TASKS.get(task_id)
+    if future is None:
+        return jsonify({"error": "Unknown task"}), 404
+    if not future.done():
+        return jsonify({"task_id": task_id, "status": "pending"}), 202
+
+    body, status = collect_task(task_id, future)
+    return jsonify(body), status
+
+@app.route("/api/task/<task_id>/stream", methods=['GET'])
+def stream_task(task_id):
+    """Server-sent events for a background task: 'pending' heartbeats, then one 'result' event."""
+    future = TASKS.get(task_id)
+    if future is None:
+        return jsonify({"error": "Unknown task"}), 404
+
+    def generate():
+        while not wait([future], timeout=TASK_STREAM_HEARTBEAT).done:
+            yield f"event: pending\ndata: {orjson.dumps({'task_id': task_id}).decode('utf-8')}\n\n"
+        body, status = collect_task(task_id, future)
+        payload = orjson.dumps({"status": status, "result": body}).decode('utf-8')
+        yield f"event: result\ndata: {payload}\n\n"
+
+    return Response(stream_with_context(generate()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache'})
+
+def summary_cache_key(combined_text: str) -> str:
+    return 'summary:' + hashlib.sha256(combined_text.encode('utf-8')).hexdigest()
+
+def summary_from_output(raw_output: str):
+    """Extracts the summary from the summarizer's reply, or None if there is no usable summary."""
+    summary_text = parse_agent_json(raw_output, 'summary', None)
+    if summary_text is None:
+         # If it's not the expected JSON but looks like a summary, use it directly
+         # Check if it seems like a reasonable summary (e.g., doesn't start with error messages)
+         summary_output = strip_code_fences(raw_output)
+         if len(summary_output) > 10 and not summary_output.lower().startswith("error"):
+             summary_text = summary_output
+         else:
+             app.logger.warning(f"Summarizer returned non-JSON and non-summary output: {summary_output}")
+    return summary_text
+
+def summarize_text(combined_text: str):
+    """Runs the summarization agent over a transcript.
+
+    Args:
+        combined_text: The full transcript text to summarize.
+
+    Returns:
+        A (response body, status code) tuple for the client.
+    """
+    cache_key = summary_cache_key(combined_text)
+    cached_summary = cache_get(cache_key)
+    if cached_summary is not None:
+        return {"summary": cached_summary}, 200
+
+    try:
+        raw_output = run_agent_sync(SUMMARY_AGENT, combined_text)
+        summary_text = summary_from_output(raw_output)
+        if summary_text is None:
+            return {"summary": "Could not extract summary."}, 200 # Not cached, so a retry can succeed
+
+        cache_set(cache_key, summary_text)
+        return {"summary": summary_text}, 200
+    except Exception as e:
+        app.logger.exception("Summarization failed")
+        # Provide a more specific error message if possible
+        return {"error": f"Summarization error: {str(e)}"}, 500
 
 @app.route("/api/summarize", methods=["POST"])
 def summarize_conversation():
-    data = request.get_json()
+    data = request.get_json(silent=True) or {}
     if not data or 'transcript_text' not in data:
         return jsonify({"error": "Missing 'transcript_text' in request body"}), 400
     
@@ -318,235 +898,217 @@ def summarize_conversation():
 
     if not combined_text:
          return jsonify({"summary": "No text provided to summarize."}) # Handle empty transcript
+    if len(combined_text.strip()) < MIN_AGENT_TEXT_LENGTH:
+        return jsonify({"summary": combined_text.strip()}) # Too short to be worth an LLM call
 
+    # Background mode: return a task id to poll at /api/task/<task_id>
+    if data.get('async') is True:
+        task_id = submit_task(summarize_text, combined_text)
+        return jsonify({
+            "task_id": task_id,
+            "status_url": f"/api/task/{task_id}",
+            "stream_url": f"/api/task/{task_id}/stream"
+        }), 202
 
-    # Create summarization agent
-    agent = Agent(
-        name="Summarizer",
-        model="gpt-4.1", # Specify the model
-        instructions=("You are an assistant that summarizes conversation transcripts. "
-                      "Pay close attention to the provided transcript. "
-                      "Provide a concise summary focusing on key topics and decisions made. "
-                      "Return ONLY a JSON object with a single key 'summary'. Example: {\"summary\": \"Discussion focused on project timelines...\"}"),
-    )
-    try:
-        raw_output = run_agent_sync(agent, combined_text)
-        # Remove markdown code fences (```json ... ```) if present
-        summary_output = re.sub(r'^```(?:json)?\s*', '', raw_output, flags=re.IGNORECASE)
-        summary_output = re.sub(r'\s*```$', '', summary_output)
-        
-        # Attempt to parse JSON, fallback to raw output
-        try:
-            summary_json = json.loads(summary_output)
-            summary_text = summary_json.get('summary', summary_output) # Use raw if key missing
-        except json.JSONDecodeError:
-             # If it's not valid JSON but looks like a summary, use it directly
-             # Check if it seems like a reasonable summary (e.g., doesn't start with error messages)
-             if len(summary_output) > 10 and not summary_output.lower().startswith("error"):
-                 summary_text = summary_output
-             else:
-                 app.logger.warning(f"Summarizer returned non-JSON and non-summary output: {summary_output}")
-                 # Fallback to a generic message or the raw output depending on desired behavior
-                 summary_text = "Could not extract summary." # Or summary_output
-
-        return jsonify({"summary": summary_text})
-    except Exception as e:
-        app.logger.error(f"Summarization failed: {e}")
-        # Provide a more specific error message if possible
-        return jsonify({"error": f"Summarization error: {str(e)}"}), 500
+    body, status = summarize_text(combined_text)
+    return jsonify(body), status
+
+def prompts_input(transcript_text: str) -> str:
+    return f"Current Transcript:\n{transcript_text}"
+
+def prompts_from_output(raw_output: str) -> list:
+    prompts_list = parse_agent_json(raw_output, 'prompts', [])
+    if not isinstance(prompts_list, list): # Ensure it's a list
+        prompts_list = []
+    return prompts_list
 
 @app.route("/api/get-prompts", methods=["POST"])
 def get_prompts():
     """Agent to generate conversation prompts based on the transcript."""
-    data = request.get_json()
+    data = request.get_json(silent=True) or {}
     if not data or 'transcript_text' not in data:
         return jsonify({"error": "Missing 'transcript_text' in request body"}), 400
     
     transcript_text = data['transcript_text']
-    if not transcript_text.strip():
-        return jsonify({"prompts": []}) # Return empty list if transcript is empty
-
-    agent = Agent(
-        name="ConversationPrompter",
-        model="gpt-4.1", # Specify the model
-        instructions=("Analyze the *latest* part of the conversation transcript. Pay close attention to the provided transcript. "
-                      "Suggest 1-2 open-ended questions/prompts to keep the discussion flowing or explore related topics. "
-                      "Focus on relevance to recent exchanges. "
-                      "Return ONLY a JSON object: {\"prompts\": [\"prompt1\", \"prompt2\"]}. If no prompts are suitable, return {\"prompts\": []}."),
-    )
-    try:
-        raw_output = run_agent_sync(agent, f"Current Transcript:\n{transcript_text}")
-        prompts_output = re.sub(r'^```(?:json)?\s*', '', raw_output, flags=re.IGNORECASE)
-        prompts_output = re.sub(r'\s*```$', '', prompts_output)
+    if len(transcript_text.strip()) < MIN_AGENT_TEXT_LENGTH:
+        return jsonify({"prompts": []}) # Return empty list if transcript is empty or too short
 
-        try:
-            prompts_json = json.loads(prompts_output)
-            prompts_list = prompts_json.get('prompts', [])
-            if not isinstance(prompts_list, list): # Ensure it's a list
-                prompts_list = []
-        except json.JSONDecodeError:
-            app.logger.warning(f"Prompter returned non-JSON output: {prompts_output}")
-            prompts_list = [] # Fallback to empty list
-
-        return jsonify({"prompts": prompts_list})
+    try:
+        raw_output = run_agent_sync(PROMPTS_AGENT, prompts_input(transcript_text))
+        return jsonify({"prompts": prompts_from_output(raw_output)})
     except Exception as e:
-        app.logger.error(f"Prompt generation failed: {e}")
+        app.logger.exception("Prompt generation failed")
         return jsonify({"error": f"Prompt generation error: {str(e)}"}), 500
 
+NO_AGENDA_ITEM = "Agenda or transcript not available."
+
+def agenda_input(transcript_text: str, agenda_text: str) -> str:
+    return f"AGENDA:\n{agenda_text}\n\nTRANSCRIPT (latest part is most important):\n{transcript_text}"
+
+def current_item_from_output(raw_output: str) -> str:
+    current_item = parse_agent_json(raw_output, 'current_item', None)
+    if current_item is None:
+        # Use the raw output if it seems descriptive
+        agenda_output = strip_code_fences(raw_output)
+        current_item = agenda_output if len(agenda_output) > 5 and not agenda_output.startswith('{') else "Could not determine current item."
+    return current_item
+
 @app.route("/api/get-current-agenda", methods=["POST"])
 def get_current_agenda():
     """Agent to determine the current agenda item based on transcript and agenda."""
-    data = request.get_json()
+    data = request.get_json(silent=True) or {}
     if not data or 'transcript_text' not in data or 'agenda_text' not in data:
         return jsonify({"error": "Missing 'transcript_text' or 'agenda_text' in request body"}), 400
 
     transcript_text = data['transcript_text']
     agenda_text = data['agenda_text']
 
-    if not transcript_text.strip() or not agenda_text.strip():
-        # If either is empty, we likely can't determine the item
-        return jsonify({"current_item": "Agenda or transcript not available."})
-
-    agent = Agent(
-        name="AgendaTracker",
-        model="gpt-4.1", # Specify the model
-        instructions=("Compare the meeting agenda with the *latest* part of the transcript. Pay close attention to the provided transcript and agenda. "
-                      "Identify which specific agenda item is most likely being discussed *right now*. "
-                      "If the discussion is between items or off-topic, state that clearly. "
-                      "Return ONLY a JSON object: {\"current_item\": \"description of current focus\"}. "
-                      "The description should be the agenda item text, or a status like 'Off-topic discussion', 'Transitioning between items', etc."),
-    )
-    try:
-        prompt = f"AGENDA:\n{agenda_text}\n\nTRANSCRIPT (latest part is most important):\n{transcript_text}"
-        raw_output = run_agent_sync(agent, prompt)
-        agenda_output = re.sub(r'^```(?:json)?\s*', '', raw_output, flags=re.IGNORECASE)
-        agenda_output = re.sub(r'\s*```$', '', agenda_output)
-
-        try:
-            agenda_json = json.loads(agenda_output)
-            current_item = agenda_json.get('current_item', "Could not determine current item.")
-        except json.JSONDecodeError:
-            app.logger.warning(f"AgendaTracker returned non-JSON output: {agenda_output}")
-            # Use the raw output if it seems descriptive
-            current_item = agenda_output if len(agenda_output) > 5 else "Could not determine current item."
+    if len(transcript_text.strip()) < MIN_AGENT_TEXT_LENGTH or not agenda_text.strip():
+        # If either is empty (or the transcript too short), we likely can't determine the item
+        return jsonify({"current_item": NO_AGENDA_ITEM})
 
-
-        return jsonify({"current_item": current_item})
+    try:
+        raw_output = run_agent_sync(AGENDA_AGENT, agenda_input(transcript_text, agenda_text))
+        return jsonify({"current_item": current_item_from_output(raw_output)})
     except Exception as e:
-        app.logger.error(f"Agenda tracking failed: {e}")
+        app.logger.exception("Agenda tracking failed")
         return jsonify({"error": f"Agenda tracking error: {str(e)}"}), 500
 
+def concepts_input(transcript_text: str) -> str:
+    return f"Analyze the following transcript for complex concepts:\n{transcript_text}"
+
+def explanations_from_output(raw_output: str) -> list:
+    explanations = parse_agent_json(raw_output, 'explanations', [])
+    if not isinstance(explanations, list): # Ensure it's a list
+         explanations = []
+    # Further validation: ensure list contains dicts with 'term' and 'explanation'
+    return [item for item in explanations if isinstance(item, dict) and 'term' in item and 'explanation' in item]
+
 @app.route("/api/explain-concepts", methods=["POST"])
 def explain_concepts():
     """Agent to identify complex concepts and (eventually) look them up."""
-    data = request.get_json()
+    data = request.get_json(silent=True) or {}
     if not data or 'transcript_text' not in data:
         return jsonify({"error": "Missing 'transcript_text' in request body"}), 400
 
     transcript_text = data['transcript_text']
-    if not transcript_text.strip():
-        return jsonify({"explanations": []}) # Return empty list if transcript is empty
-
-    # TODO: Integrate a real web search tool here.
-    # Example using a placeholder function tool:
-    # def web_search_tool(query: str) -> str:
-    #     """Searches the web for a given query and returns a summary."""
-    #     # Replace with actual web search implementation (e.g., using requests, BeautifulSoup, search API)
-    #     print(f"Simulating web search for: {query}")
-    #     if "gradient descent" in query.lower():
-    #         return "Gradient descent is an optimization algorithm used to minimize a function by iteratively moving in the direction of steepest descent."
-    #     elif "react hooks" in query.lower():
-    #         return "React Hooks are functions that let you 'hook into' React state and lifecycle features from function components."
-    #     else:
-    #         return f"No specific information found for '{query}' in this simulation."
-
-    agent = Agent(
-        name="ConceptExplainer",
-        model="gpt-4.1", # Specify the model
-        instructions=("Read the *latest* part of the conversation transcript. Pay close attention to the provided transcript. "
-                      "Identify 1-2 potentially complex technical terms, jargon, or concepts mentioned *recently*. "
-                      "Provide a brief (1-sentence) definition/explanation for each. "
-                      # "Use the web_search_tool if needed." # Uncomment when tool is added
-                      "Return ONLY a JSON object: {\"explanations\": [{\"term\": \"Term1\", \"explanation\": \"Explanation1\"}, ...]}. "
-                      "If no complex concepts are found, return {\"explanations\": []}."),
-        # tools=[] # Add actual tool function here when implemented
-    )
-    try:
-        prompt = f"Analyze the following transcript for complex concepts:\n{transcript_text}"
-        raw_output = run_agent_sync(agent, prompt)
-        concepts_output = re.sub(r'^```(?:json)?\s*', '', raw_output, flags=re.IGNORECASE)
-        concepts_output = re.sub(r'\s*```$', '', concepts_output)
+    if len(transcript_text.strip()) < MIN_AGENT_TEXT_LENGTH:
+        return jsonify({"explanations": []}) # Return empty list if transcript is empty or too short
 
-        try:
-            concepts_json = json.loads(concepts_output)
-            explanations = concepts_json.get('explanations', [])
-            if not isinstance(explanations, list): # Ensure it's a list
-                 explanations = []
-            # Further validation: ensure list contains dicts with 'term' and 'explanation'
-            explanations = [item for item in explanations if isinstance(item, dict) and 'term' in item and 'explanation' in item]
-
-        except json.JSONDecodeError:
-            app.logger.warning(f"ConceptExplainer returned non-JSON output: {concepts_output}")
-            explanations = [] # Fallback to empty list
-
-        return jsonify({"explanations": explanations})
+    try:
+        raw_output = run_agent_sync(CONCEPTS_AGENT, concepts_input(transcript_text))
+        return jsonify({"explanations": explanations_from_output(raw_output)})
     except Exception as e:
-        app.logger.error(f"Concept explanation failed: {e}")
+        app.logger.exception("Concept explanation failed")
         return jsonify({"error": f"Concept explanation error: {str(e)}"}), 500
 
+@app.route("/api/analyze", methods=["POST"])
+def analyze_transcript():
+    """Runs the summary, prompts, agenda and concepts agents concurrently over one transcript.
+
+    Returns the same keys as the individual endpoints in one body, so the
+    wall-clock time is that of the slowest agent rather than the sum. Agents
+    that fail are reported under "errors" without failing the others.
+    """
+    data = request.get_json(silent=True) or {}
+    if not data or 'transcript_text' not in data:
+        return jsonify({"error": "Missing 'transcript_text' in request body"}), 400
+
+    transcript_text = data['transcript_text']
+    agenda_text = data.get('agenda_text') or ''
+    if len(transcript_text.strip()) < MIN_AGENT_TEXT_LENGTH:
+        # Too short to be worth any LLM call
+        return jsonify({
+            "summary": transcript_text.strip() or "No text provided to summarize.",
+            "prompts": [],
+            "current_item": NO_AGENDA_ITEM,
+            "explanations": []
+        })
+
+    results = {}
+    calls = {}  # response key -> (agent, prompt, output parser)
+    summary_key = summary_cache_key(transcript_text)
+    cached_summary = cache_get(summary_key)
+    if cached_summary is not None:
+        results["summary"] = cached_summary
+    else:
+        calls["summary"] = (SUMMARY_AGENT, transcript_text, summary_from_output)
+    calls["prompts"] = (PROMPTS_AGENT, prompts_input(transcript_text), prompts_from_output)
+    if agenda_text.strip():
+        calls["current_item"] = (AGENDA_AGENT, agenda_input(transcript_text, agenda_text), current_item_from_output)
+    else:
+        results["current_item"] = NO_AGENDA_ITEM
+    calls["explanations"] = (CONCEPTS_AGENT, concepts_input(transcript_text), explanations_from_output)
+
+    try:
+        outputs = run_agents_sync([(agent, prompt) for agent, prompt, _ in calls.values()])
+    except Exception as e:
+        app.logger.exception("Transcript analysis failed")
+        return jsonify({"error": f"Analysis error: {str(e)}"}), 500
+
+    errors = {}
+    for (key, (agent, _, parse_output)), output in zip(calls.items(), outputs):
+        if isinstance(output, BaseException):
+            app.logger.error(f"Error running agent {agent.name}: {output}")
+            errors[key] = str(output)
+        else:
+            results[key] = parse_output(output)
+
+    if "summary" in calls and "summary" in results:
+        if results["summary"] is None:
+            results["summary"] = "Could not extract summary." # Not cached, so a retry can succeed
+        else:
+            cache_set(summary_key, results["summary"])
+    if errors:
+        results["errors"] = errors
+    return jsonify(results)
+
 @app.route("/api/send-summary-email", methods=["POST"])
 def send_summary_email():
     """Endpoint to send the generated summary via email."""
-    data = request.get_json()
-    recipient_email = data.get('recipient_email')
+    data = request.get_json(silent=True) or {}
+    recipient_emails = data.get('recipient_emails') or []
+    if not recipient_emails and data.get('recipient_email'):
+        recipient_emails = [data.get('recipient_email')]
     summary_text = data.get('summary_text')
 
-    if not recipient_email or not summary_text:
+    if not recipient_emails or not summary_text:
         return jsonify({"error": "Missing recipient email or summary text"}), 400
 
     # Basic email validation (optional but recommended)
-    if not re.match(r"^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$", recipient_email):
-         return jsonify({"error": "Invalid email format"}), 400
+    for recipient_email in recipient_emails:
+        if not isinstance(recipient_email, str) or not is_valid_email(recipient_email):
+            return jsonify({"error": "Invalid email format"}), 400
 
     subject = "Meeting Summary"
     # You might want to format the body more nicely
     body = f"Here is the summary of the recent meeting:\n\n{summary_text}"
 
-    success = send_email(recipient_email, subject, body)
+    failed = send_emails(recipient_emails, subject, body)
 
-    if success:
+    if not failed:
         return jsonify({"message": "Email sent successfully"}), 200
+    elif len(failed) < len(recipient_emails):
+        return jsonify({"message": "Email sent to some recipients", "failed": failed}), 207
     else:
         # Check if the error is due to missing config to provide a better client message
         if not os.getenv("GMAIL_SENDER_EMAIL") or not os.getenv("GMAIL_APP_PASSWORD"):
              return jsonify({"error": "Email configuration missing on the server."}), 500
         return jsonify({"error": "Failed to send email. Check server logs."}), 500
 
+def truncate_transcript() -> bool:
+    """Empties the transcript file, returning False if there was none."""
+    if not os.path.exists(TRANSCRIPT_PATH):
+        return False
+    open(TRANSCRIPT_PATH, 'w').close()
+    return True
+
 @app.route("/api/clear-transcript", methods=["POST"])
 def clear_transcript():
     """Clear the existing transcript file to start fresh"""
     try:
-        transcripts_file = os.path.join(os.path.dirname(__file__), 'recordings', 'transcript.txt')
-        
-        # Ensure the recordings directory exists and has appropriate permissions
-        recordings_dir = os.path.join(os.path.dirname(__file__), 'recordings')
-        os.makedirs(recordings_dir, exist_ok=True)
-        
-        try:
-            # Try to make the directory accessible
-            os.chmod(recordings_dir, 0o777)
-        except Exception as e:
-            app.logger.warning(f"Unable to set directory permissions: {e}")
-        
-        if os.path.exists(transcripts_file):
-            open(transcripts_file, 'w').close()  # Truncate file
-            
-            # Set permissive permissions on the file
-            try:
-                os.chmod(transcripts_file, 0o666)  # Read/write for everyone
-            except Exception as e:
-                app.logger.warning(f"Unable to set transcript file permissions: {e}")
-                
+        # Clear on the transcript writer, after any appends already queued
+        if TRANSCRIPT_EXECUTOR.submit(truncate_transcript).result():
             return jsonify({"message": "Transcript file cleared"}), 200
         return jsonify({"message": "No transcript file found"}), 200
     except PermissionError as e:
@@ -558,4 +1120,5 @@ def clear_transcript():
 
 if __name__ == "__main__":
     # Ensure this runs only locally, Vercel uses its own server mechanism
-    app.run(debug=True) # Or configure host/port as needed
\ No newline at end of file
+    # For anything beyond local debugging, serve with gunicorn (see README)
+    app.run(port=5328, debug=True, threaded=True)
\ No newline at end of file
@@ -17,6 +17,10 @@ interface TranscriptionData {
   words: TranscriptionWord[]
 }
 
+// Join transcription texts, skipping empty chunks so agent prompts stay small
+const combineTranscriptions = (items: TranscriptionData[]) =>
+  items.map(t => t.text).filter(text => text && text.trim()).join('\n\n')
+
 // Type for Concept Explanations
 interface Explanation {
   term: string;
@@ -204,7 +208,7 @@ export default function AudioRecorder({
     setEmailStatus(null)
     try {
       // Combine transcriptions into a single string
-      const combinedText = transcriptions.map(t => t.text).join('\n\n'); 
+      const combinedText = combineTranscriptions(transcriptions);
       
       const response = await fetch('/api/summarize', {
         method: 'POST',
@@ -305,7 +309,7 @@ export default function AudioRecorder({
         setTranscriptions(prev => {
           const newTranscriptions = [...prev, data.transcription];
           // Combine text after state update
-          const combinedText = newTranscriptions.map(t => t.text).join('\n\n');
+          const combinedText = combineTranscriptions(newTranscriptions);
           // Call callback if transcript has actually changed
           if (onTranscriptUpdate && combinedText.length > lastSentTranscriptLength) {
             onTranscriptUpdate(combinedText);